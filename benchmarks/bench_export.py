@@ -0,0 +1,257 @@
+# Benchmarks of ExportSQLite on synthetic catalogs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Time and memory-profile the phases of an export on synthetic catalogs
+made of stand-ins for the GRT objects of MySQL Workbench, and write the
+results as JSON so that runs can be compared:
+
+    python benchmarks/bench_export.py --tables 100,1000,10000 \\
+        --rows 10000,100000 --shape chain,cycles -o results.json
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2 only gets timings
+    tracemalloc = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+import export_sqlite_grt as export
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+class GrtObject(object):
+    """Stand-in for a GRT object with the attributes the export reads"""
+
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+    @property
+    def __id__(self):
+        return id(self)
+
+class GrtTable(GrtObject):
+    def inserts(self):
+        return self._inserts
+
+def datatype(name):
+    return GrtObject(name=name, flags=[])
+
+INT = datatype('INT')
+VARCHAR = datatype('VARCHAR')
+DECIMAL = datatype('DECIMAL')
+
+def column(name, simple_type, length=-1, not_null=0, auto_increment=0,
+           default=''):
+    return GrtObject(name=name, comment='', simpleType=simple_type,
+                     userType=None, flags=[], length=length,
+                     datatypeExplicitParams='', isNotNull=not_null,
+                     autoIncrement=auto_increment, defaultValue=default)
+
+def index(name, index_type, columns):
+    return GrtObject(name=name, indexType=index_type,
+                     isPrimary=int(index_type == 'PRIMARY'),
+                     columns=[GrtObject(referencedColumn=c, descend=0)
+                              for c in columns])
+
+def references(shape, count, rnd):
+    """Return the index of the table every table references, or None"""
+    if shape == 'chain':
+        # Every table references the one before, the deepest possible order
+        return [i - 1 if i > 0 else None for i in range(count)]
+    if shape == 'cycles':
+        # Circular references in groups of 10 tables
+        parents = []
+        for i in range(count):
+            start = i - i % 10
+            parents.append(start + (i - start + 1) % min(10, count - start))
+        return parents
+    return [rnd.randrange(count) if i > 0 else None for i in range(count)]
+
+def synthetic_catalog(tables, rows, shape, seed=0):
+    """Return a catalog with one schema of tables tables, rows rows spread
+    evenly over them and foreign keys between them in shape
+    """
+    rnd = random.Random(seed)
+    schema = GrtObject(name='main', comment='', tables=[])
+    for i in range(tables):
+        columns = [column('id', INT, not_null=1, auto_increment=1),
+                   column('name', VARCHAR, 45),
+                   column('value', DECIMAL, default='0'),
+                   column('parent_id', INT)]
+        tbl = GrtTable(name='t%d' % i, comment='', columns=columns,
+                       indices=[index('PRIMARY', 'PRIMARY', columns[:1]),
+                                index('name_idx', 'INDEX', columns[1:2])],
+                       foreignKeys=[], _inserts='')
+        schema.tables.append(tbl)
+
+    for tbl, parent in zip(schema.tables,
+                           references(shape, tables, rnd)):
+        if parent is None:
+            continue
+        parent = schema.tables[parent]
+        tbl.foreignKeys.append(GrtObject(
+                name='fk_%s_%s' % (tbl.name, parent.name), comment='',
+                columns=tbl.columns[3:4], referencedTable=parent,
+                referencedColumns=parent.columns[:1],
+                deleteRule='NO ACTION', updateRule='NO ACTION'))
+
+    for i, tbl in enumerate(schema.tables):
+        table_rows = rows // tables + int(i < rows % tables)
+        tbl._inserts = ''.join(
+                "INSERT INTO `main`.`%s` (`id`, `name`, `value`, `parent_id`)"
+                " VALUES (%d, 'name \\'%d\\'', %d.%02d, NULL);\n" % (
+                    tbl.name, row, row, rnd.randrange(1000),
+                    rnd.randrange(100))
+                for row in range(1, table_rows + 1))
+
+    return GrtObject(schemata=[schema])
+
+def measure(function, repeat):
+    """Return the best time of repeat runs of function in seconds and the
+    peak of memory allocated by one run in bytes, None without tracemalloc
+    """
+    best = None
+    for i in range(repeat):
+        gc.collect()
+        start = time.time()
+        function()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {'seconds': round(best, 6), 'peak_bytes': peak}
+
+def run_case(tables, rows, shape, options, repeat):
+    grt_catalog = synthetic_catalog(tables, rows, shape)
+    cat = export.snapshot_catalog(grt_catalog, [])
+    schema = cat.schemata[0]
+
+    def create_statements():
+        out = StringIO()
+        for tbl in schema.tables:
+            export.create_table(out, '', tbl, options)
+            export.create_indices(out, '', tbl, options)
+
+    def insert_statements():
+        out = StringIO()
+        for tbl in schema.tables:
+            export.export_rows(out, '', schema, tbl, options)
+
+    def export_tables():
+        out = StringIO()
+        for tbl in schema.tables:
+            export.export_table(out, '', schema, tbl, options)
+
+    phases = [
+        ('snapshot_catalog',
+         lambda: export.snapshot_catalog(grt_catalog, [])),
+        ('validate_catalog', lambda: export.validate_catalog(cat)),
+        ('order_tables', lambda: export.order_tables(schema)),
+        ('create_statements', create_statements),
+        ('insert_statements', insert_statements),
+        ('export_table', export_tables),
+        ('export_script', lambda: export.export_script(cat, options)),
+    ]
+    return {
+        'tables': tables,
+        'rows': rows,
+        'shape': shape,
+        'phases': dict((name, measure(function, repeat))
+                       for name, function in phases),
+    }
+
+def sizes(text):
+    return [int(size) for size in text.split(',')]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark the export phases on synthetic catalogs.')
+    parser.add_argument(
+        '--tables', type=sizes, default=[100, 1000, 10000],
+        help='comma separated numbers of tables (default: 100,1000,10000)')
+    parser.add_argument(
+        '--rows', type=sizes, default=[10000],
+        help='comma separated numbers of rows (default: 10000)')
+    parser.add_argument(
+        '--shape', default='chain',
+        help='comma separated foreign key shapes: chain, cycles or random'
+             ' (default: chain)')
+    parser.add_argument(
+        '--batch-size', type=int, default=1,
+        help='rows per INSERT statement (default: %(default)s)')
+    parser.add_argument(
+        '--bulk-load', action='store_true',
+        help='use the bulk load layout')
+    parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='runs per phase, the best time counts (default: %(default)s)')
+    parser.add_argument(
+        '-o', '--output',
+        help='JSON result file (default: standard output)')
+    args = parser.parse_args(argv)
+
+    shapes = args.shape.split(',')
+    for shape in shapes:
+        if shape not in ('chain', 'cycles', 'random'):
+            parser.error('unknown shape %s' % shape)
+
+    options = export.ExportSQLiteOptions()
+    options.insert_batch_size = args.batch_size
+    options.bulk_load = args.bulk_load
+
+    cases = []
+    for tables, rows, shape in itertools.product(args.tables, args.rows,
+                                                 shapes):
+        sys.stderr.write('%d tables, %d rows, %s\n' % (tables, rows, shape))
+        cases.append(run_case(tables, rows, shape, options, args.repeat))
+
+    result = {
+        'version': export.__version__,
+        'python': platform.python_version(),
+        'options': vars(options),
+        'cases': cases,
+    }
+    text = json.dumps(result, indent=2, separators=(',', ': '),
+                      sort_keys=True) + '\n'
+    if args.output is None:
+        sys.stdout.write(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())